@@ -0,0 +1,165 @@
+# ======================
+# 📦 Shared data & analysis helpers
+# ======================
+# Extracted from app.py so every page/script shares one implementation
+# (and one process-global st.cache_data entry) instead of its own copy.
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Country name harmonization rules (applied in order, vectorized via .str)
+REPLACEMENTS = [
+    ("republic of ", ""),
+    ("of america", ""),
+    ("korea, republic of", "south korea"),
+    ("czechia", "czech republic"),
+    ("viet nam", "vietnam"),
+    ("people's republic of china", "china"),
+    ("united states of america", "united states"),
+    ("u.s.", "united states"),
+    ("uk", "united kingdom"),
+    (" ", ""),
+]
+
+
+def clean_countries(s):
+    s = s.astype(str).str.strip().str.lower()
+    for old, new in REPLACEMENTS:
+        s = s.str.replace(old, new, regex=False)
+    return s
+
+
+# Explicit schemas skip the dtype-inference pass of read_csv; float32 halves
+# the bytes moved by every downstream merge, mean and plot, and usecols keeps
+# unused columns (Year, Group, the index column) out of memory entirely
+YEAR_COLS = ["2020", "2021", "2022", "2023", "2024", "2025"]
+RND_USECOLS = ["Country", "GBARD_USD_Million"]
+RND_DTYPES = {"GBARD_USD_Million": "float32"}
+GDP_USECOLS = ["Country"] + YEAR_COLS
+GDP_DTYPES = {y: "float32" for y in YEAR_COLS}
+ECO_USECOLS = ["Country", "Stock Index Value", "Inflation Rate (%)", "Interest Rate (%)"]
+ECO_DTYPES = {"Interest Rate (%)": "float32",
+              "Stock Index Value": "float32",
+              "Inflation Rate (%)": "float32"}
+
+
+@st.cache_data
+def load_data():
+    # read_csv releases the GIL while parsing, so the three files load in parallel
+    with ThreadPoolExecutor(3) as ex:
+        rnd, gdp, eco = ex.map(
+            lambda args: pd.read_csv(args[0], engine="pyarrow",
+                                     usecols=args[1], dtype=args[2]),
+            [("data/RnD_Data_filled.csv", RND_USECOLS, RND_DTYPES),
+             ("data/GDP_Data_filled.csv", GDP_USECOLS, GDP_DTYPES),
+             ("data/Country-Year_Economic_Indicators_filled.csv", ECO_USECOLS, ECO_DTYPES)],
+        )
+
+    rnd["c"] = clean_countries(rnd["Country"])
+    gdp["c"] = clean_countries(gdp["Country"])
+    eco["c"] = clean_countries(eco["Country"])
+
+    # One shared Categorical for the join key: merges and isin then run on
+    # integer codes instead of hashing strings
+    cats = pd.CategoricalDtype(sorted(set(rnd["c"]) | set(gdp["c"]) | set(eco["c"])))
+    for d in (rnd, gdp, eco):
+        d["c"] = d["c"].astype(cats)
+
+    # Calculate average GDP (2020–2025): one vectorized reduction over a
+    # contiguous float32 block instead of pandas' per-column dispatch
+    gdp["GDP_mean"] = gdp[YEAR_COLS].to_numpy(dtype=np.float32).mean(axis=1)
+
+    # Per-country GBARD mean via bincount on the categorical codes: two
+    # C-level reductions instead of the DataFrameGroupBy machinery
+    codes = rnd["c"].cat.codes.to_numpy()
+    vals = rnd["GBARD_USD_Million"].to_numpy(dtype="float64")
+    ok = ~np.isnan(vals)
+    sums = np.bincount(codes[ok], weights=vals[ok], minlength=len(cats.categories))
+    counts = np.bincount(codes[ok], minlength=len(cats.categories))
+    present = np.flatnonzero(counts)
+    rnd_mean = pd.DataFrame({
+        "c": pd.Categorical.from_codes(present, dtype=cats),
+        "GBARD_USD_Million": (sums[present] / counts[present]).astype("float32"),
+    })
+
+    return rnd_mean, gdp, eco
+
+
+@st.cache_data
+def country_options(rnd):
+    # c carries the union Categorical built in load_data, so its categories
+    # already are the sorted union across all three files
+    return list(rnd["c"].cat.categories)
+
+
+@st.cache_data
+def build_merged(rnd, gdp, eco):
+    merged = rnd.merge(gdp[["c","GDP_mean"]], on="c", how="left") \
+                .merge(eco[["c","Interest Rate (%)","Stock Index Value","Inflation Rate (%)"]], on="c", how="left")
+    # Title-case the ~40 categories once, not every row
+    merged["Country"] = merged["c"].cat.rename_categories(str.title)
+    return merged
+
+
+@st.cache_data
+def build_long(rnd, gdp, eco):
+    # Melt build_merged's wide frame into long form so each plot is a slice
+    # by metric and the country filter is a single isin over one frame
+    # (reusing the cached merge instead of re-joining here)
+    wide = build_merged(rnd, gdp, eco)
+    long = wide.melt(id_vars=["c", "Country", "GBARD_USD_Million"],
+                     value_vars=METRIC_COLS, var_name="metric", value_name="value")
+    long = long[long["GBARD_USD_Million"].notna() & long["value"].notna()]
+    # GDP_mean is a single value per country, but the eco join repeats it
+    # once per eco-year row; keep one GDP row per country so the metric
+    # matches the old rnd⋈gdp pair frame (the eco metrics genuinely have
+    # one row per country-year and stay as-is)
+    dup_gdp = (long["metric"] == "GDP_mean") & long.duplicated(["c", "metric"])
+    return long[~dup_gdp]
+
+
+# The four dependent variables of the Map A regressions
+METRIC_COLS = ["GDP_mean", "Interest Rate (%)", "Inflation Rate (%)", "Stock Index Value"]
+
+# Static Map A findings table. Lives here (imported once per process) rather
+# than in app.py, whose top level re-executes on every Streamlit rerun.
+SUMMARY_TABLE = pd.DataFrame({
+    "Dependent Variable": ["GDP_mean", "Interest Rate (%)", "Stock Index Value", "Inflation Rate (%)"],
+    "Coefficient (β₁) Direction": ["+", "−", "+", "−"],
+    "p-value": ["p > 0.05", "p > 0.05", "p > 0.05", "p > 0.05"],
+    "Significance": ["❌ Not Significant", "❌ Not Significant", "❌ Not Significant", "❌ Not Significant"],
+    "Interpretation": [
+        "GDP shows near-significant positive relationship (p≈0.065)",
+        "No significant difference in interest rates between groups",
+        "Stock index shows weak, non-significant variation",
+        "Inflation difference not statistically significant"
+    ]
+})
+
+
+@st.cache_data
+def batch_ols(long_df, xcol, ycols):
+    # Closed-form simple OLS of value on xcol for every metric in one
+    # vectorized pass over the long frame: the sufficient statistics are
+    # bincounted per metric code, so each metric is fit on exactly its own
+    # rows (GDP_mean on one row per country, eco metrics per country-year)
+    codes = pd.Categorical(long_df["metric"], categories=list(ycols)).codes
+    x = long_df[xcol].to_numpy(dtype=float)
+    y = long_df["value"].to_numpy(dtype=float)
+    k = len(ycols)
+    n = np.bincount(codes, minlength=k)
+    sx = np.bincount(codes, weights=x, minlength=k)
+    sy = np.bincount(codes, weights=y, minlength=k)
+    sxx = np.bincount(codes, weights=x * x, minlength=k)
+    sxy = np.bincount(codes, weights=x * y, minlength=k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b1 = (n * sxy - sx * sy) / (n * sxx - sx ** 2)
+        b0 = (sy - b1 * sx) / n
+    return {yc: (i, s) for yc, i, s in zip(ycols, b0, b1)}
+
+
+@st.cache_data
+def to_csv_bytes(df):
+    return df.to_csv(index=False).encode("utf-8")
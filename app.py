@@ -1,45 +1,44 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-import statsmodels.api as sm
+import plotly.io as pio
+
+# orjson serializes the figure JSON far faster than stdlib json; fall back
+# silently if it is not installed
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+from analysis import (
+    METRIC_COLS,
+    SUMMARY_TABLE,
+    batch_ols,
+    load_data,
+    build_merged,
+    build_long,
+    country_options,
+    to_csv_bytes,
+)
 
-# ======================
-# 1️⃣ Load Data
-# ======================
-@st.cache_data
-def load_data():
-    rnd = pd.read_csv("data/RnD_Data_filled.csv")
-    gdp = pd.read_csv("data/GDP_Data_filled.csv")
-    eco = pd.read_csv("data/Country-Year_Economic_Indicators_filled.csv")
-
-    def clean(x):
-        return (str(x).strip().lower()
-                .replace("republic of ", "")
-                .replace("of america", "")
-                .replace("korea, republic of", "south korea")
-                .replace("czechia", "czech republic")
-                .replace("viet nam", "vietnam")
-                .replace("people's republic of china", "china")
-                .replace("united states of america", "united states")
-                .replace("u.s.", "united states")
-                .replace("uk", "united kingdom")
-                .replace(" ", "")
-               )
-    rnd["c"] = rnd["Country"].apply(clean)
-    gdp["c"] = gdp["Country"].apply(clean)
-    eco["c"] = eco["Country"].apply(clean)
-
-    # Calculate average GDP (2020–2025)
-    gdp["GDP_mean"] = gdp[["2020","2021","2022","2023","2024","2025"]].mean(axis=1)
-
-    # Convert numeric columns
-    eco["Interest Rate (%)"] = eco["Interest Rate (%)"].astype(float)
-    eco["Stock Index Value"] = eco["Stock Index Value"].astype(float)
-    eco["Inflation Rate (%)"] = eco["Inflation Rate (%)"].astype(float)
-
-    rnd_mean = rnd.groupby("c", as_index=False)["GBARD_USD_Million"].mean()
-
-    return rnd_mean, gdp, eco
+
+# Cache the built figures: a repeat of the same filtered frame (e.g. the
+# common "show all" case) skips both the OLS fit and the JSON assembly
+@st.cache_data(hash_funcs={pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=True).values.tobytes()})
+def scatter_with_trend(df, ycol, title, coef):
+    # WebGL markers keep the browser responsive when every country is shown;
+    # the single global trend line stays an SVG trace (cheap)
+    fig = px.scatter(df, x="GBARD_USD_Million", y="value", color="Country",
+                     title=title, labels={"value": ycol}, render_mode="webgl")
+    fig.update_layout(showlegend=df["Country"].nunique() <= 15)
+    b0, b1 = coef
+    if len(df) >= 2 and np.isfinite(b1):
+        xs = np.array([df["GBARD_USD_Million"].min(), df["GBARD_USD_Million"].max()])
+        fig.add_scatter(x=xs, y=b0 + b1 * xs, mode="lines", name="OLS trend",
+                        line=dict(color="gray", dash="dot"))
+    return fig
 
 
 # ======================
@@ -122,13 +121,10 @@ rnd, gdp, eco = load_data()
 # ======================
 st.header("📂 Step 1: Dataset Overview")
 
-merged = rnd.merge(gdp[["c","GDP_mean"]], on="c", how="left") \
-            .merge(eco[["c","Interest Rate (%)","Stock Index Value","Inflation Rate (%)"]], on="c", how="left")
-merged["Country"] = merged["c"].str.title()
+merged = build_merged(rnd, gdp, eco)
 
 st.dataframe(merged, use_container_width=True, height=300)
-csv = merged.to_csv(index=False).encode('utf-8')
-st.download_button("📥 Download Raw Data (CSV)", csv, "merged_dataset.csv", "text/csv")
+st.download_button("📥 Download Raw Data (CSV)", to_csv_bytes(merged), "merged_dataset.csv", "text/csv")
 
 # ======================
 # 🔍 Investigation Section
@@ -247,20 +243,7 @@ with st.expander("📈 Analysis Design"):
 
 # ⚙️ Regression Summary Table
 st.subheader("⚙️ Summary of Regression Findings")
-summary_table = pd.DataFrame({
-    "Dependent Variable": ["GDP_mean", "Interest Rate (%)", "Stock Index Value", "Inflation Rate (%)"],
-    "Coefficient (β₁) Direction": ["+", "−", "+", "−"],
-    "p-value": ["p > 0.05", "p > 0.05", "p > 0.05", "p > 0.05"],
-    "Significance": ["❌ Not Significant", "❌ Not Significant", "❌ Not Significant", "❌ Not Significant"],
-    "Interpretation": [
-        "GDP shows near-significant positive relationship (p≈0.065)",
-        "No significant difference in interest rates between groups",
-        "Stock index shows weak, non-significant variation",
-        "Inflation difference not statistically significant"
-    ]
-})
-
-st.dataframe(summary_table, use_container_width=True)
+st.dataframe(SUMMARY_TABLE, use_container_width=True)
 
 # 🧪 Variable-level Interpretation
 st.subheader("🧪 Step-by-Step Hypothesis Interpretation")
@@ -312,44 +295,36 @@ In short, STEM investment influences economies *systemically*, not through isola
 # ======================
 # 4️⃣ Country Selector
 # ======================
-countries = st.multiselect(
-    "Select country/countries (leave empty to show all):",
-    options=sorted(set(list(rnd["c"]) + list(gdp["c"]) + list(eco["c"]))),
-    default=None
-)
-
-def merge_pair(df1, df2, key):
-    merged = pd.merge(df1, df2, on="c", how="inner")
-    merged.dropna(subset=["GBARD_USD_Million", key], inplace=True)
-    merged["Country"] = merged["c"].str.title()
-    return merged
-
-gdp_df = merge_pair(rnd, gdp[["c", "GDP_mean"]], "GDP_mean")
-int_df = merge_pair(rnd, eco[["c", "Interest Rate (%)"]], "Interest Rate (%)")
-inf_df = merge_pair(rnd, eco[["c", "Inflation Rate (%)"]], "Inflation Rate (%)")
-stk_df = merge_pair(rnd, eco[["c", "Stock Index Value"]], "Stock Index Value")
+# A fragment: changing the multiselect reruns only this block, not the page
+@st.fragment
+def country_section(long_df):
+    countries = st.multiselect(
+        "Select country/countries (leave empty to show all):",
+        options=country_options(rnd),
+        default=None
+    )
 
-if countries:
-    gdp_df = gdp_df[gdp_df["c"].isin(countries)]
-    int_df = int_df[int_df["c"].isin(countries)]
-    inf_df = inf_df[inf_df["c"].isin(countries)]
-    stk_df = stk_df[stk_df["c"].isin(countries)]
+    # Merges are cached; only the cheap country filter below runs per rerun.
+    # Hash the selection into a set once instead of re-hashing the list per isin.
+    if countries:
+        long_df = long_df[long_df["c"].isin(set(countries))]
 
-fig1 = px.scatter(gdp_df, x="GBARD_USD_Million", y="GDP_mean",
-    color="Country", trendline="ols", title="STEM Investment vs GDP")
-st.plotly_chart(fig1, use_container_width=True)
+    # All four trendlines come from one vectorized fit over the long frame,
+    # so each is fit on the same rows its scatter plot shows
+    coefs = batch_ols(long_df, "GBARD_USD_Million", METRIC_COLS)
 
-fig2 = px.scatter(stk_df, x="GBARD_USD_Million", y="Stock Index Value",
-    color="Country", trendline="ols", title="STEM Investment vs Stock Index")
-st.plotly_chart(fig2, use_container_width=True)
+    for ycol, title in [
+        ("GDP_mean", "STEM Investment vs GDP"),
+        ("Stock Index Value", "STEM Investment vs Stock Index"),
+        ("Interest Rate (%)", "STEM Investment vs Interest Rate"),
+        ("Inflation Rate (%)", "STEM Investment vs Inflation Rate"),
+    ]:
+        sub = long_df[long_df["metric"] == ycol]
+        fig = scatter_with_trend(sub, ycol, title, coefs[ycol])
+        st.plotly_chart(fig, use_container_width=True)
 
-fig3 = px.scatter(int_df, x="GBARD_USD_Million", y="Interest Rate (%)",
-    color="Country", trendline="ols", title="STEM Investment vs Interest Rate")
-st.plotly_chart(fig3, use_container_width=True)
 
-fig4 = px.scatter(inf_df, x="GBARD_USD_Million", y="Inflation Rate (%)",
-    color="Country", trendline="ols", title="STEM Investment vs Inflation Rate")
-st.plotly_chart(fig4, use_container_width=True)
+country_section(build_long(rnd, gdp, eco))
 
 # 📘 Conclusion
 st.success("""
@@ -491,59 +466,154 @@ Implications:
 """.strip()
 
 import os
-import base64
-import streamlit as st
+import binascii
+from concurrent.futures import ThreadPoolExecutor
 
 # ==============================
 # 📄 Executive Summary Section
 # ==============================
-import streamlit as st
-import os
-import tempfile
-import base64
 import streamlit.components.v1 as components
 
+# pybase64 encodes with SIMD kernels (4-10x faster on multi-MB files);
+# fall back to binascii, which skips base64.b64encode's wrapper overhead
+try:
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    def _b64encode(data):
+        return binascii.b2a_base64(data, newline=False)
+
+# Feed the encoder 3-byte-aligned ~768 KiB slices: each chunk's output
+# concatenates without mid-stream padding, stays cache-resident for the
+# SIMD kernel, and peak transient allocation is one chunk rather than a
+# whole second copy of the file. ASCII decode is the CPython fast path.
+_B64_CHUNK = 3 * (1 << 18)
+
+
+def _b64encode_str(data):
+    mv = memoryview(data)
+    out = bytearray()
+    for i in range(0, len(mv), _B64_CHUNK):
+        out += _b64encode(mv[i:i + _B64_CHUNK])
+    return out.decode("ascii")
+
 st.header("📑 Executive Summary")
 
-# ✅ data 폴더의 PDF 경로
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-pdf_path = os.path.join(BASE_DIR, "data", "Executive summary.pdf")
-
-if os.path.exists(pdf_path):
-    # ✅ 임시 파일로 복사
-    with open(pdf_path, "rb") as src:
-        pdf_data = src.read()
-        temp_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-        temp_pdf.write(pdf_data)
-        temp_pdf.close()
-
-    # ✅ 1️⃣ Chrome에서도 작동하는 iframe 방식
-    components.html(
-        f"""
-        <iframe src="file://{temp_pdf.name}" 
-                width="100%" height="700"
-                style="border: 1px solid #ddd; border-radius: 10px;">
-        </iframe>
-        """,
-        height=750,
-    )
+# Static copy served by Streamlit at /app/static/ (see .streamlit/config.toml):
+# the browser fetches and caches the file itself, so the iframe needs no
+# base64 payload at all
+STATIC_PDF_URL = "/app/static/Executive_summary.pdf"
+
+
+# ✅ data 폴더의 PDF 경로 — paths and existence checks are stable for the
+# process lifetime, so resolve them once instead of stat()ing every rerun
+@st.cache_resource
+def pdf_meta():
+    base = os.path.dirname(os.path.abspath(__file__))
+    path = os.path.join(base, "data", "Executive summary.pdf")
+    static = os.path.join(base, "static", "Executive_summary.pdf")
+    return path, os.path.exists(path), os.path.exists(static)
+
+
+pdf_path, pdf_exists, has_static = pdf_meta()
+
+# Constant halves of the fallback embed, so only one concat touches the
+# base64 payload
+_PDF_HTML_PRE = '<iframe id="pv" src="data:application/pdf;base64,'
+_PDF_HTML_POST = (
+    '" width="100%" height="700"'
+    ' style="border: 1px solid #ddd; border-radius: 10px;"></iframe>'
+    '<p><a id="pv-link" target="_blank">📖 View in Browser</a></p>'
+    "<script>document.getElementById('pv-link').href ="
+    " document.getElementById('pv').src;</script>"
+)
 
-    # ✅ 2️⃣ 브라우저 새 탭 열기 링크
-    b64_pdf = base64.b64encode(pdf_data).decode("utf-8")
-    st.markdown(
-        f"[📖 View in Browser](data:application/pdf;base64,{b64_pdf})",
-        unsafe_allow_html=True
-    )
 
-    # ✅ 3️⃣ 다운로드 버튼
-    st.download_button(
-        label="📥 Download Executive Summary (PDF)",
-        data=pdf_data,
-        file_name="Executive_summary.pdf",
-        mime="application/pdf"
-    )
-else:
-    st.warning("⚠️ 'Executive summary.pdf' 파일이 data 폴더에 없습니다.")
+# The PDF is a static asset: read and encode it once per (path, mtime).
+# cache_resource shares the single bytes/str object across all sessions —
+# both are immutable, so the usual don't-mutate caveat doesn't apply —
+# where cache_data would hand each session its own copy.
+@st.cache_resource
+def pdf_blob(path, mtime):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@st.cache_resource
+def pdf_b64(path, mtime):
+    # Prefer the build-time encoded copy (tools/prebuild.py) when it is
+    # fresh: zero encode CPU at runtime, just a file read
+    pre = path + ".b64"
+    if os.path.exists(pre) and os.path.getmtime(pre) >= mtime:
+        with open(pre, "r", encoding="ascii") as f:
+            return f.read()
+    return _b64encode_str(pdf_blob(path, mtime))
+
+
+# Single worker shared across reruns for the background encode
+@st.cache_resource
+def pdf_executor():
+    return ThreadPoolExecutor(1)
+
+
+# A fragment: unrelated widget interactions elsewhere on the page no
+# longer re-emit the viewer component payload
+@st.fragment
+def pdf_viewer():
+    if pdf_exists:
+        # ✅ 1️⃣ Chrome에서도 작동하는 iframe 방식 (임시 파일 복사 불필요)
+        # Prefer the static URL; fall back to the cached data URI if the static
+        # copy is missing
+        if has_static:
+            # The browser fetches the raw bytes from the static endpoint and
+            # shows them through a blob URL: no base64 anywhere, and repeat
+            # visits come from the browser cache
+            components.html(
+                f"""
+                <iframe id="pv" width="100%" height="700"
+                        style="border: 1px solid #ddd; border-radius: 10px;">
+                </iframe>
+                <script>
+                fetch("{STATIC_PDF_URL}")
+                    .then(r => r.blob())
+                    .then(b => {{
+                        document.getElementById("pv").src = URL.createObjectURL(b);
+                    }});
+                </script>
+                """,
+                height=750,
+            )
+            # ✅ 2️⃣ 브라우저 새 탭 열기 링크 — 정적 URL이면 base64 payload가 필요 없음
+            st.link_button("📖 View in Browser", STATIC_PDF_URL)
+        else:
+            # Only this fallback branch ever needs the encoded payload. Kick the
+            # (cached) read+encode off on a worker thread — the encoder's C loop
+            # releases the GIL — and reserve the viewer's slot so the widgets
+            # below render while it runs.
+            pdf_fut = pdf_executor().submit(pdf_b64, pdf_path, os.path.getmtime(pdf_path))
+            viewer_slot = st.container()
+
+        # ✅ 3️⃣ 다운로드 버튼 — 바이트는 실제 클릭 시점에만 조회 (deferred)
+        st.download_button(
+            label="📥 Download Executive Summary (PDF)",
+            data=lambda: pdf_blob(pdf_path, os.path.getmtime(pdf_path)),
+            file_name="Executive_summary.pdf",
+            mime="application/pdf"
+        )
+
+        if not has_static:
+            b64_pdf = pdf_fut.result()
+            # One component carries both the viewer and the link; the base64
+            # string appears once and the anchor copies it client-side, so the
+            # websocket ships one ~4/3·|PDF| blob instead of two. Plain
+            # concatenation onto constant pre/post chunks avoids the f-string
+            # format machinery copying the multi-MB payload around.
+            with viewer_slot:
+                components.html(_PDF_HTML_PRE + b64_pdf + _PDF_HTML_POST, height=790)
+    else:
+        st.warning("⚠️ 'Executive summary.pdf' 파일이 data 폴더에 없습니다.")
+
+
+pdf_viewer()
 
 
 
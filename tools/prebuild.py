@@ -0,0 +1,31 @@
+"""Pre-encode static assets so the app never base64-encodes at runtime.
+
+Run after replacing data/Executive summary.pdf:
+
+    python tools/prebuild.py
+
+Writes "<pdf>.b64" next to the PDF; app.py serves that pre-encoded copy
+when it is at least as new as the PDF itself.
+"""
+import os
+
+try:
+    from pybase64 import b64encode
+except ImportError:
+    from base64 import b64encode
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PDF_PATH = os.path.join(BASE_DIR, "data", "Executive summary.pdf")
+
+
+def main():
+    with open(PDF_PATH, "rb") as f:
+        raw = f.read()
+    out = PDF_PATH + ".b64"
+    with open(out, "wb") as f:
+        f.write(b64encode(raw))
+    print(f"wrote {out} ({os.path.getsize(out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()